@@ -1,6 +1,8 @@
 import sys
 import os
 import glob
+import html
+from itertools import combinations
 sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/../')
 
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QTableWidget, 
@@ -11,9 +13,89 @@ from PyQt6.QtCore import Qt, QThread, pyqtSignal, QUrl
 from api.openai_integration import (fetch_medication_info, fetch_contraindications, fetch_medication_description, 
                                     chat_with_gpt, get_greeting)
 from export.export_to_excel import export_medications_to_excel
-from database.setup import create_connection, setup_database
+from database.setup import create_connection, setup_database, load_interactions, save_interactions
 from config import get_api_key, set_api_key
 
+SERIOUSNESS_RANK = {'very serious': 0, 'serious': 1, 'moderate': 2, 'minor': 3}
+
+def normalize_seriousness(seriousness):
+    # GPT often wraps table cells in markdown bold
+    return seriousness.replace('*', '').strip()
+
+def seriousness_rank(seriousness):
+    return SERIOUSNESS_RANK.get(normalize_seriousness(seriousness).lower(), len(SERIOUSNESS_RANK))
+
+def is_contraindication_finding(contraindication):
+    # Skip the 'N/A' placeholder from parse_contraindications and markdown separator rows
+    seriousness = normalize_seriousness(contraindication['seriousness'])
+    if seriousness.lower() == 'n/a':
+        return False
+    return not all(char in '-: ' for char in seriousness + contraindication['description'])
+
+def scan_cohort(patients):
+    # Index every distinct drug across the cohort so each pair is resolved only once
+    drug_names = {}
+    patient_pairs = []
+    for user, db_file, medications in patients:
+        names = [name.strip() for name in medications if name.strip()]
+        drugs = sorted({name.lower() for name in names})
+        if len(drugs) < 2:
+            patient_pairs.append((user, db_file, None))
+            continue
+        for name in names:
+            drug_names.setdefault(name.lower(), name)
+        patient_pairs.append((user, db_file, list(combinations(drugs, 2))))
+
+    pair_patients = {}
+    for user, db_file, pairs in patient_pairs:
+        for pair in pairs or []:
+            pair_patients.setdefault(pair, []).append(db_file)
+
+    # Resolve from the cached interactions in every user database before calling the API
+    resolved = {}
+    cached = {}
+    for _, db_file, pairs in patient_pairs:
+        if pairs is None:
+            continue
+        cached[db_file] = load_interactions(db_file)
+        for pair, contraindications in cached[db_file].items():
+            if pair in pair_patients:
+                resolved.setdefault(pair, contraindications)
+
+    fetched = 0
+    pending = {}
+    try:
+        for pair, db_files in pair_patients.items():
+            if pair not in resolved:
+                resolved[pair] = fetch_contraindications([drug_names[pair[0]], drug_names[pair[1]]])
+                fetched += 1
+            for db_file in db_files:
+                if pair not in cached[db_file]:
+                    pending.setdefault(db_file, {})[pair] = resolved[pair]
+    finally:
+        # Keep every result already fetched so a retry only asks for the pairs still missing
+        for db_file, interactions in pending.items():
+            save_interactions(db_file, interactions)
+
+    report = []
+    for user, _, pairs in patient_pairs:
+        if pairs is None:
+            report.append((user, None))
+            continue
+        findings = []
+        for drug_a, drug_b in pairs:
+            for contraindication in resolved[(drug_a, drug_b)]:
+                if is_contraindication_finding(contraindication):
+                    findings.append((drug_names[drug_a], drug_names[drug_b],
+                                     normalize_seriousness(contraindication['seriousness']),
+                                     contraindication['description']))
+        findings.sort(key=lambda finding: seriousness_rank(finding[2]))
+        report.append((user, findings))
+    report.sort(key=lambda entry: (entry[1] is None,
+                                   seriousness_rank(entry[1][0][2]) if entry[1] else len(SERIOUSNESS_RANK) + 1))
+    summary = {'drugs': len(drug_names), 'pairs': len(pair_patients), 'fetched': fetched}
+    return report, summary
+
 class Worker(QThread):
     finished = pyqtSignal(object)
     error = pyqtSignal(Exception)
@@ -151,6 +233,10 @@ class MedicationApp(QMainWindow):
         contraindications_button.clicked.connect(self.checkContraindications)
         button_layout.addWidget(contraindications_button)
 
+        self.cohort_scan_button = QPushButton('Cohort Scan')
+        self.cohort_scan_button.clicked.connect(self.scanCohort)
+        button_layout.addWidget(self.cohort_scan_button)
+
         edit_button = QPushButton('Edit Medications')
         edit_button.clicked.connect(self.editMedications)
         button_layout.addWidget(edit_button)
@@ -368,6 +454,47 @@ class MedicationApp(QMainWindow):
     def onCheckContraindicationsFinished(self, contraindications_info):
         self.append_message("AI", contraindications_info, "#00FF00")  # Display contraindications in chat
 
+    def scanCohort(self):
+        patients = []
+        for index in range(self.tab_widget.count()):
+            tab = self.tab_widget.widget(index)
+            if isinstance(tab, UserTab):
+                patients.append((self.tab_widget.tabText(index), tab.db_name, [med['name'] for med in tab.medications]))
+
+        if not any(len(medications) > 1 for _, _, medications in patients):
+            QMessageBox.warning(self, 'No Medication Pairs', 'No user has two or more medications to check for contraindications.')
+            return
+
+        # The scan can outlast other actions, so it gets its own worker instead of sharing self.worker
+        self.cohort_scan_button.setEnabled(False)
+        self.scan_worker = Worker(scan_cohort, patients)
+        self.scan_worker.finished.connect(self.onScanCohortFinished)
+        self.scan_worker.error.connect(self.onScanCohortError)
+        self.scan_worker.start()
+
+    def onScanCohortFinished(self, result):
+        self.cohort_scan_button.setEnabled(True)
+        report, summary = result
+        rows = []
+        for user, findings in report:
+            if findings is None:
+                rows.append(f"<tr><td>{html.escape(user)}</td><td colspan=\"3\">Fewer than two medications, not checked.</td></tr>")
+                continue
+            if not findings:
+                rows.append(f"<tr><td>{html.escape(user)}</td><td colspan=\"3\">No contraindications found.</td></tr>")
+            for drug_a, drug_b, seriousness, description in findings:
+                rows.append(f"<tr><td>{html.escape(user)}</td><td>{html.escape(drug_a)} + {html.escape(drug_b)}</td>"
+                            f"<td>{html.escape(seriousness)}</td><td>{html.escape(description)}</td></tr>")
+        message = (f"<p>Checked {summary['drugs']} distinct medications in {summary['pairs']} distinct pairs "
+                   f"({summary['fetched']} fetched, {summary['pairs'] - summary['fetched']} from cache).</p>"
+                   "<table><tr><th>User</th><th>Medications</th><th>Seriousness</th><th>Description</th></tr>"
+                   + "".join(rows) + "</table>")
+        self.append_message("AI", message, "#00FF00")
+
+    def onScanCohortError(self, error):
+        self.cohort_scan_button.setEnabled(True)
+        self.onWorkerError(error)
+
     def exportToExcel(self):
         current_tab = self.current_tab()
         if not isinstance(current_tab, UserTab):
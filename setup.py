@@ -26,6 +26,43 @@ def setup_database(db_file='medications.db'):
         # Add the 'description' column if it doesn't exist
         cursor.execute('ALTER TABLE medications ADD COLUMN description TEXT')
     
+    # Create the interactions table used to cache drug-pair contraindications
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS interactions (
+        id INTEGER PRIMARY KEY,
+        drug_a TEXT NOT NULL,
+        drug_b TEXT NOT NULL,
+        seriousness TEXT NOT NULL,
+        description TEXT NOT NULL
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_interactions_pair ON interactions (drug_a, drug_b)')
+    
+    conn.commit()
+    conn.close()
+
+def load_interactions(db_file):
+    # Return cached contraindications keyed by (drug_a, drug_b), with drug_a <= drug_b
+    conn = create_connection(db_file)
+    cursor = conn.cursor()
+    cursor.execute('SELECT drug_a, drug_b, seriousness, description FROM interactions')
+    interactions = {}
+    for drug_a, drug_b, seriousness, description in cursor.fetchall():
+        interactions.setdefault((drug_a, drug_b), []).append({
+            'seriousness': seriousness,
+            'description': description
+        })
+    conn.close()
+    return interactions
+
+def save_interactions(db_file, interactions):
+    # Write every (drug_a, drug_b) -> contraindications entry in a single transaction
+    conn = create_connection(db_file)
+    cursor = conn.cursor()
+    for (drug_a, drug_b), contraindications in interactions.items():
+        cursor.execute('DELETE FROM interactions WHERE drug_a = ? AND drug_b = ?', (drug_a, drug_b))
+        cursor.executemany('INSERT INTO interactions (drug_a, drug_b, seriousness, description) VALUES (?, ?, ?, ?)',
+                           [(drug_a, drug_b, c['seriousness'], c['description']) for c in contraindications])
     conn.commit()
     conn.close()
 
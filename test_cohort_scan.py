@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from database.setup import setup_database, load_interactions, save_interactions
+from gui.main_window import scan_cohort, seriousness_rank
+
+def fake_contraindications(medications):
+    if 'Warfarin' in medications:
+        return [
+            {'seriousness': '---', 'description': '---'},
+            {'seriousness': '**Very Serious**', 'description': 'Bleeding risk'},
+            {'seriousness': 'Unusual', 'description': 'Unlabelled finding'}
+        ]
+    return [{'seriousness': 'N/A', 'description': 'No contraindications found.'}]
+
+class TestCohortScan(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_files = {}
+        for user in ['alice', 'bob', 'carol']:
+            self.db_files[user] = os.path.join(self.temp_dir.name, f'{user}.db')
+            setup_database(self.db_files[user])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def patients(self):
+        return [
+            ('alice', self.db_files['alice'], ['Aspirin', 'Warfarin', 'Lisinopril']),
+            ('bob', self.db_files['bob'], ['aspirin ', 'WARFARIN', '']),
+            ('carol', self.db_files['carol'], ['Lisinopril'])
+        ]
+
+    def test_save_load_round_trip(self):
+        db_file = self.db_files['alice']
+        pair = ('aspirin', 'warfarin')
+        save_interactions(db_file, {pair: [{'seriousness': 'Serious', 'description': 'Old'}]})
+        save_interactions(db_file, {pair: [{'seriousness': 'Minor', 'description': 'New'}]})
+        self.assertEqual(load_interactions(db_file), {pair: [{'seriousness': 'Minor', 'description': 'New'}]})
+
+    def test_shared_pairs_fetched_once(self):
+        with patch('gui.main_window.fetch_contraindications', side_effect=fake_contraindications) as fetch:
+            report, summary = scan_cohort(self.patients())
+        self.assertEqual(fetch.call_count, 3)
+        self.assertEqual(summary, {'drugs': 3, 'pairs': 3, 'fetched': 3})
+
+    def test_second_scan_uses_cache(self):
+        with patch('gui.main_window.fetch_contraindications', side_effect=fake_contraindications):
+            scan_cohort(self.patients())
+        with patch('gui.main_window.fetch_contraindications') as fetch:
+            report, summary = scan_cohort(self.patients())
+        fetch.assert_not_called()
+        self.assertEqual(summary['fetched'], 0)
+
+    def test_cached_pair_written_to_other_users(self):
+        pair = ('aspirin', 'warfarin')
+        save_interactions(self.db_files['alice'], {pair: fake_contraindications(['Aspirin', 'Warfarin'])})
+        with patch('gui.main_window.fetch_contraindications', side_effect=fake_contraindications) as fetch:
+            scan_cohort(self.patients())
+        self.assertNotIn(('Aspirin', 'Warfarin'), [call.args[0] for call in fetch.call_args_list])
+        self.assertIn(pair, load_interactions(self.db_files['bob']))
+
+    def test_fetched_results_kept_on_error(self):
+        calls = []
+
+        def failing_contraindications(medications):
+            calls.append(medications)
+            if len(calls) == 3:
+                raise Exception('Error fetching data: 429')
+            return fake_contraindications(medications)
+
+        with patch('gui.main_window.fetch_contraindications', side_effect=failing_contraindications):
+            with self.assertRaises(Exception):
+                scan_cohort(self.patients())
+        self.assertEqual(len(load_interactions(self.db_files['alice'])), 2)
+
+    def test_report_ranking(self):
+        with patch('gui.main_window.fetch_contraindications', side_effect=fake_contraindications):
+            report, summary = scan_cohort(self.patients())
+        self.assertEqual([user for user, _ in report], ['alice', 'bob', 'carol'])
+        self.assertIsNone(report[2][1])
+        bob_findings = report[1][1]
+        self.assertEqual([finding[2] for finding in bob_findings], ['Very Serious', 'Unusual'])
+        self.assertEqual(seriousness_rank('**Very Serious**'), 0)
+        self.assertGreater(seriousness_rank('Unusual'), seriousness_rank('Minor'))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file